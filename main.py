@@ -1,19 +1,35 @@
 #!/usr/bin/env python3
 
 import click
+import csv
+import json
+import os
+import sqlite3
 import sys
+import tempfile
+import time
 from datetime import datetime
 from tabulate import tabulate
 from services.user_service import UserService
 from services.room_service import RoomService
 from services.booking_service import BookingService
+from services.event_service import EventService
+from services.backup_service import BackupService
+from services.batch_service import BatchService
 from models.room import RoomType
 from utils.helpers import parse_date
+from utils.load_test import DEFAULT_MIX, parse_mix, run_load_test
 
 # Initialize services
 user_service = UserService()
 room_service = RoomService()
 booking_service = BookingService()
+waitlist_service = booking_service.waitlist_service
+event_service = EventService()
+backup_service = BackupService()
+
+# Characters used to draw booked and free nights in the text calendar
+CALENDAR_CELLS = bytes.maketrans(b'\x00\x01', b'.#')
 
 # Global variable to store current user
 current_user = None
@@ -121,25 +137,37 @@ def make_booking():
         click.echo(f"   Nights: {(check_out_date - check_in_date).days}")
     except ValueError as e:
         click.echo(f"❌ Error: {e}")
+        if str(e) == "Room is already booked for these dates":
+            offer_waitlist(room_id, check_in_date, check_out_date)
+
+def offer_waitlist(room_id, check_in_date, check_out_date):
+    """Offer to join the waitlist for a fully booked room type"""
+    room = room_service.get_room_by_id(room_id)
+    if not room or not click.confirm(f'Join the waitlist for a {room.room_type.value} room on these dates?'):
+        return
+    entry = waitlist_service.join_waitlist(current_user.id, room.room_type.value, check_in_date, check_out_date)
+    click.echo(f"✅ Added to waitlist! Entry ID: {entry.id}")
+    click.echo("   You will be booked automatically when a room frees up.")
 
 def view_my_bookings():
     """View user's bookings"""
-    bookings = booking_service.get_user_bookings(current_user.id)
-    if not bookings:
-        click.echo("No bookings found.")
-        return
-    
-    table_data = []
-    for b in bookings:
-        room = room_service.get_room_by_id(b.room_id)
-        table_data.append([
-            b.id,
-            room.number if room else 'Unknown',
-            b.check_in.strftime('%Y-%m-%d'),
-            b.check_out.strftime('%Y-%m-%d'),
-            f"KSh {b.total_price:.2f}",
-            b.status.value
-        ])
+    with booking_service.db.snapshot():
+        bookings = booking_service.get_user_bookings(current_user.id)
+        if not bookings:
+            click.echo("No bookings found.")
+            return
+        
+        table_data = []
+        for b in bookings:
+            room = room_service.get_room_by_id(b.room_id)
+            table_data.append([
+                b.id,
+                room.number if room else 'Unknown',
+                b.check_in.strftime('%Y-%m-%d'),
+                b.check_out.strftime('%Y-%m-%d'),
+                f"KSh {b.total_price:.2f}",
+                b.status.value
+            ])
     
     click.echo(tabulate(table_data, headers=['ID', 'Room', 'Check-in', 'Check-out', 'Total', 'Status'], tablefmt='grid'))
 
@@ -243,6 +271,51 @@ def list(available_only):
                    "✅" if r.is_available else "❌"] for r in rooms]
     click.echo(tabulate(table_data, headers=['ID', 'Number', 'Type', 'Capacity', 'Price/Night', 'Available'], tablefmt='grid'))
 
+@room.command()
+@click.option('--room-id', prompt='Room ID', type=int, help='Room ID')
+@click.option('--available/--unavailable', prompt='Available', help='Open or close the room for booking')
+def availability(room_id, available):
+    """Open or close a room for booking"""
+    if booking_service.set_room_availability(room_id, available):
+        state = "available" if available else "unavailable"
+        click.echo(f"✅ Room {room_id} marked {state}.")
+    else:
+        click.echo(f"❌ Room {room_id} not found.")
+
+@room.command()
+@click.option('--from', 'start', prompt='From date (YYYY-MM-DD)', help='First night to show')
+@click.option('--to', 'end', prompt='To date (YYYY-MM-DD)', help='Day after the last night to show')
+@click.option('--type', type=click.Choice(['single', 'double', 'dormitory']), help='Only show rooms of this type')
+@click.option('--format', 'output_format', type=click.Choice(['text', 'csv', 'json']), default='text', help='Output format')
+def calendar(start, end, type, output_format):
+    """Show which nights each room is booked"""
+    try:
+        occupancy = booking_service.occupancy_calendar(parse_date(start), parse_date(end), type)
+    except ValueError as e:
+        click.echo(f"❌ Error: {e}")
+        return
+    
+    days = occupancy.days()
+    if output_format == 'json':
+        click.echo(json.dumps(occupancy.to_dict()))
+    elif output_format == 'csv':
+        writer = csv.writer(sys.stdout)
+        writer.writerow(['room', 'type'] + [d.strftime('%Y-%m-%d') for d in days])
+        for room, row in zip(occupancy.rooms, occupancy.nights):
+            writer.writerow([room.number, room.room_type.value, *row])
+    else:
+        width = max([len(r.number) for r in occupancy.rooms] + [4])
+        months = [' '] * len(days)
+        for i, d in enumerate(days):
+            if i == 0 or d.day == 1:
+                label = d.strftime('%b')[:len(days) - i]
+                months[i:i + len(label)] = label
+        click.echo(f"{'':{width}}  " + ''.join(months))
+        click.echo(f"{'Room':{width}}  " + ''.join(str(d.day % 10) for d in days))
+        for room, row in zip(occupancy.rooms, occupancy.nights):
+            click.echo(f"{room.number:{width}}  " + row.translate(CALENDAR_CELLS).decode())
+        click.echo(f"\n   # booked, . free  |  Occupancy: {occupancy.occupancy_rate() * 100:.1f}%")
+
 # Booking commands
 @cli.group()
 def booking():
@@ -268,6 +341,40 @@ def create(user_id, room_id, check_in, check_out):
     except ValueError as e:
         click.echo(f"❌ Error: {e}")
 
+@booking.command()
+@click.option('--user-id', prompt='User ID', type=int, help='User making the group booking')
+@click.option('--guests', prompt='Number of guests', type=int, help='Number of guests in the group')
+@click.option('--from', 'check_in', prompt='Check-in date (YYYY-MM-DD)', help='Check-in date')
+@click.option('--to', 'check_out', prompt='Check-out date (YYYY-MM-DD)', help='Check-out date')
+@click.option('--max-rooms', type=int, help='Maximum number of rooms to use')
+@click.option('--strategy', type=click.Choice(['cheapest', 'fewest']), default='cheapest', help='Optimize for price or room count')
+@click.option('--dry-run', is_flag=True, help='Show the allocation without booking it')
+def allocate(user_id, guests, check_in, check_out, max_rooms, strategy, dry_run):
+    """Book the best set of free rooms for a group"""
+    try:
+        check_in_date = parse_date(check_in)
+        check_out_date = parse_date(check_out)
+        nights = (check_out_date - check_in_date).days
+        
+        if dry_run:
+            rooms = booking_service.plan_group_allocation(guests, check_in_date, check_out_date, max_rooms, strategy)
+            table_data = [[r.id, r.number, r.room_type.value, r.capacity, f"KSh {r.price_per_night * nights:.2f}"] for r in rooms]
+            total = sum(r.price_per_night for r in rooms) * nights
+        else:
+            bookings = booking_service.allocate_group(user_id, guests, check_in_date, check_out_date, max_rooms, strategy)
+            table_data = []
+            for b in bookings:
+                room = room_service.get_room_by_id(b.room_id)
+                table_data.append([b.id, room.number, room.room_type.value, room.capacity, f"KSh {b.total_price:.2f}"])
+            total = sum(b.total_price for b in bookings)
+            click.echo(f"✅ Group booked in {len(bookings)} rooms!")
+        
+        headers = ['Room ID' if dry_run else 'Booking ID', 'Room', 'Type', 'Capacity', 'Total']
+        click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
+        click.echo(f"   Guests: {guests}, Nights: {nights}, Total Price: KSh {total:.2f}")
+    except ValueError as e:
+        click.echo(f"❌ Error: {e}")
+
 @booking.command()
 @click.option('--booking-id', prompt='Booking ID', type=int, help='Booking ID to cancel')
 def cancel(booking_id):
@@ -281,28 +388,29 @@ def cancel(booking_id):
 @click.option('--user-id', type=int, help='Filter by user ID')
 def list(user_id):
     """List bookings"""
-    if user_id:
-        bookings = booking_service.get_user_bookings(user_id)
-    else:
-        bookings = booking_service.list_all_bookings()
-    
-    if not bookings:
-        click.echo("No bookings found.")
-        return
-    
-    table_data = []
-    for b in bookings:
-        user = user_service.get_user_by_id(b.user_id)
-        room = room_service.get_room_by_id(b.room_id)
-        table_data.append([
-            b.id, 
-            user.name if user else 'Unknown',
-            room.number if room else 'Unknown',
-            b.check_in.strftime('%Y-%m-%d'),
-            b.check_out.strftime('%Y-%m-%d'),
-            f"KSh {b.total_price:.2f}",
-            b.status.value
-        ])
+    with booking_service.db.snapshot():
+        if user_id:
+            bookings = booking_service.get_user_bookings(user_id)
+        else:
+            bookings = booking_service.list_all_bookings()
+        
+        if not bookings:
+            click.echo("No bookings found.")
+            return
+        
+        table_data = []
+        for b in bookings:
+            user = user_service.get_user_by_id(b.user_id)
+            room = room_service.get_room_by_id(b.room_id)
+            table_data.append([
+                b.id, 
+                user.name if user else 'Unknown',
+                room.number if room else 'Unknown',
+                b.check_in.strftime('%Y-%m-%d'),
+                b.check_out.strftime('%Y-%m-%d'),
+                f"KSh {b.total_price:.2f}",
+                b.status.value
+            ])
     
     click.echo(tabulate(table_data, headers=['ID', 'User', 'Room', 'Check-in', 'Check-out', 'Total', 'Status'], tablefmt='grid'))
 
@@ -310,13 +418,14 @@ def list(user_id):
 @click.option('--booking-id', prompt='Booking ID', type=int, help='Booking ID')
 def details(booking_id):
     """Show booking details"""
-    booking = booking_service.get_booking_by_id(booking_id)
-    if not booking:
-        click.echo(f"❌ Booking {booking_id} not found.")
-        return
-    
-    user = user_service.get_user_by_id(booking.user_id)
-    room = room_service.get_room_by_id(booking.room_id)
+    with booking_service.db.snapshot():
+        booking = booking_service.get_booking_by_id(booking_id)
+        if not booking:
+            click.echo(f"❌ Booking {booking_id} not found.")
+            return
+        
+        user = user_service.get_user_by_id(booking.user_id)
+        room = room_service.get_room_by_id(booking.room_id)
     
     click.echo(f"\n📋 Booking Details (ID: {booking.id})")
     click.echo(f"   User: {user.name if user else 'Unknown'} ({user.email if user else 'N/A'})")
@@ -327,6 +436,178 @@ def details(booking_id):
     click.echo(f"   Total Price: KSh {booking.total_price:.2f}")
     click.echo(f"   Status: {booking.status.value}")
 
+# Waitlist commands
+@cli.group()
+def waitlist():
+    """Waitlist commands"""
+    pass
+
+@waitlist.command()
+@click.option('--user-id', prompt='User ID', type=int, help='User ID')
+@click.option('--room-type', prompt='Room type', type=click.Choice(['single', 'double', 'dormitory']), help='Room type')
+@click.option('--check-in', prompt='Check-in date (YYYY-MM-DD)', help='Check-in date')
+@click.option('--check-out', prompt='Check-out date (YYYY-MM-DD)', help='Check-out date')
+def join(user_id, room_type, check_in, check_out):
+    """Join the waitlist for a room type"""
+    try:
+        if not user_service.get_user_by_id(user_id):
+            raise ValueError("User not found")
+        entry = waitlist_service.join_waitlist(user_id, room_type, parse_date(check_in), parse_date(check_out))
+        click.echo(f"✅ Added to waitlist! Entry ID: {entry.id}")
+    except ValueError as e:
+        click.echo(f"❌ Error: {e}")
+
+@waitlist.command()
+@click.option('--entry-id', prompt='Entry ID', type=int, help='Waitlist entry ID to remove')
+def leave(entry_id):
+    """Leave the waitlist"""
+    if waitlist_service.cancel_entry(entry_id):
+        click.echo(f"✅ Waitlist entry {entry_id} removed.")
+    else:
+        click.echo(f"❌ Waiting entry {entry_id} not found.")
+
+@waitlist.command()
+@click.option('--user-id', type=int, help='Filter by user ID')
+@click.option('--status', type=click.Choice(['waiting', 'fulfilled', 'cancelled']), help='Filter by status')
+def list(user_id, status):
+    """List waitlist entries"""
+    if user_id:
+        entries = [e for e in waitlist_service.get_user_entries(user_id) if not status or e.status.value == status]
+    else:
+        entries = waitlist_service.list_entries(status)
+    
+    if not entries:
+        click.echo("No waitlist entries found.")
+        return
+    
+    table_data = [[e.id, e.user_id, e.room_type, e.check_in.strftime('%Y-%m-%d'), e.check_out.strftime('%Y-%m-%d'),
+                   e.status.value, e.booking_id or ''] for e in entries]
+    click.echo(tabulate(table_data, headers=['ID', 'User', 'Type', 'Check-in', 'Check-out', 'Status', 'Booking'], tablefmt='grid'))
+
+# Event journal commands
+@cli.group()
+def events():
+    """Event journal commands"""
+    pass
+
+@events.command()
+@click.option('--since', default=0, type=int, help='Only show events after this sequence number')
+@click.option('--type', 'event_type', help='Filter by event type, e.g. booking.created')
+@click.option('--follow', is_flag=True, help='Keep streaming new events as they are written')
+@click.option('--poll-interval', default=1.0, type=float, help='Seconds between polls when following')
+def tail(since, event_type, follow, poll_interval):
+    """Stream journal events as JSON lines"""
+    try:
+        for event in event_service.tail(since, follow, poll_interval, event_type=event_type):
+            click.echo(event.to_json())
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+# Database maintenance commands
+@cli.group()
+def db():
+    """Database maintenance commands"""
+    pass
+
+def show_copy_progress(copied, total):
+    """Print backup/restore progress on a single line"""
+    percent = (copied / total * 100) if total else 100
+    click.echo(f"\r   Copied {copied}/{total} pages ({percent:.0f}%)", nl=False)
+
+@db.command()
+@click.option('--output', prompt='Backup file', help='Path to write the backup to')
+@click.option('--compress', is_flag=True, help='Gzip the backup file')
+@click.option('--pages', default=256, type=int, help='Pages copied per step')
+@click.option('--sleep', 'step_sleep', default=0.01, type=float, help='Seconds to pause between steps')
+@click.option('--no-verify', is_flag=True, help='Skip the integrity check')
+@click.option('--quiet', is_flag=True, help='Do not report progress')
+def backup(output, compress, pages, step_sleep, no_verify, quiet):
+    """Back up the database while it is in use"""
+    try:
+        start = time.perf_counter()
+        size = backup_service.backup(output, compress, pages, step_sleep,
+                                     None if quiet else show_copy_progress, not no_verify)
+        if not quiet:
+            click.echo()
+        click.echo(f"✅ Backup written to {output} ({size} bytes, {time.perf_counter() - start:.2f}s)")
+    except (ValueError, OSError, sqlite3.Error) as e:
+        click.echo(f"\n❌ Error: {e}")
+
+@db.command()
+@click.option('--input', 'input_path', prompt='Backup file', help='Backup file to restore from')
+@click.option('--no-verify', is_flag=True, help='Skip the integrity check')
+@click.option('--quiet', is_flag=True, help='Do not report progress')
+@click.confirmation_option(prompt='This replaces all current data. Continue?')
+def restore(input_path, no_verify, quiet):
+    """Restore the database from a backup"""
+    try:
+        backup_service.restore(input_path, None if quiet else show_copy_progress, not no_verify)
+        if not quiet:
+            click.echo()
+        click.echo(f"✅ Database restored from {input_path}")
+    except (ValueError, OSError, sqlite3.Error) as e:
+        click.echo(f"\n❌ Error: {e}")
+
+@db.command()
+@click.option('--db', 'db_path', default=os.path.join(tempfile.gettempdir(), 'hostel-loadtest.db'),
+              help='Scratch database to create for the test (recreated for every configuration)')
+@click.option('--workers', default='1,2,4,8', help='Comma-separated numbers of concurrent worker processes')
+@click.option('--journal-mode', default='delete,wal', help='Comma-separated journal modes to compare')
+@click.option('--timeout', default='5', help='Comma-separated busy timeouts in seconds')
+@click.option('--duration', default=10.0, type=float, help='Seconds to run each configuration')
+@click.option('--mix', default=','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items()), help='Operation weights')
+@click.option('--users', default=100, type=int, help='Users to seed')
+@click.option('--rooms', default=200, type=int, help='Rooms to seed')
+@click.option('--days', default=60, type=int, help='Spread of check-in dates in days')
+@click.option('--json', 'as_json', is_flag=True, help='Print one JSON result per configuration')
+def loadtest(db_path, workers, journal_mode, timeout, duration, mix, users, rooms, days, as_json):
+    """Measure booking throughput and lock contention under concurrent load"""
+    try:
+        worker_counts = [int(w) for w in workers.split(',')]
+        timeouts = [float(t) for t in timeout.split(',')]
+        modes = [m.strip().lower() for m in journal_mode.split(',')]
+        weights = parse_mix(mix)
+    except ValueError as e:
+        click.echo(f"❌ Error: {e}")
+        return
+    
+    table_data = []
+    for mode in modes:
+        for busy_timeout in timeouts:
+            for count in worker_counts:
+                try:
+                    result = run_load_test(db_path, count, mode, busy_timeout, duration, weights, users, rooms, days)
+                except ValueError as e:
+                    click.echo(f"❌ Error: {e}")
+                    return
+                if as_json:
+                    click.echo(json.dumps(result))
+                    sys.stdout.flush()
+                    continue
+                table_data.append([
+                    mode, count, f"{busy_timeout:g}s", result['operations'], f"{result['throughput']:.0f}",
+                    f"{result['p50_ms']:.1f}", f"{result['p99_ms']:.1f}", f"{result['write_p99_ms']:.1f}",
+                    result['locked'], result['errors'], result['rejected'], result['double_bookings']
+                ])
+                click.echo(f"   {mode} / {count} workers / {busy_timeout:g}s timeout done", err=True)
+    
+    if not as_json:
+        headers = ['Journal', 'Workers', 'Timeout', 'Ops', 'Ops/s', 'p50 ms', 'p99 ms', 'Write p99 ms',
+                   'Locked', 'Errors', 'Rejected', 'Double-booked']
+        click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
+
+# Batch mode
+@cli.command()
+@click.argument('input', type=click.File('r'), default='-')
+@click.option('--transaction-size', default=0, type=int, help='Operations per transaction (0 commits each one)')
+def batch(input, transaction_size):
+    """Run JSONL operations from a file or stdin in one process"""
+    batch_service = BatchService(booking_service)
+    for result in batch_service.run(input, transaction_size):
+        click.echo(json.dumps(result))
+        sys.stdout.flush()
+
 # Quick setup command for demo
 @cli.command()
 def setup():
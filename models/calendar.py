@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+@dataclass
+class OccupancyCalendar:
+    start: datetime
+    end: datetime
+    rooms: List = field(default_factory=list)
+    # One bytearray per room, one byte per night: 1 if booked
+    nights: List[bytearray] = field(default_factory=list)
+    
+    def days(self):
+        return [self.start + timedelta(days=i) for i in range((self.end - self.start).days)]
+    
+    def is_booked(self, room_index, day_index):
+        return bool(self.nights[room_index][day_index])
+    
+    def occupancy_rate(self):
+        total = len(self.rooms) * (self.end - self.start).days
+        if not total:
+            return 0.0
+        return sum(sum(row) for row in self.nights) / total
+    
+    def to_dict(self):
+        return {
+            'from': self.start.strftime('%Y-%m-%d'),
+            'to': self.end.strftime('%Y-%m-%d'),
+            'days': [d.strftime('%Y-%m-%d') for d in self.days()],
+            'rooms': [{
+                'id': room.id,
+                'number': room.number,
+                'room_type': room.room_type.value,
+                'booked': list(row)
+            } for room, row in zip(self.rooms, self.nights)]
+        }
\ No newline at end of file
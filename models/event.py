@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from datetime import datetime
+import json
+
+@dataclass
+class Event:
+    seq: int
+    event_type: str
+    entity_id: int
+    payload: dict
+    created_at: datetime
+    
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'event_type': self.event_type,
+            'entity_id': self.entity_id,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat()
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            seq=data['seq'],
+            event_type=data['event_type'],
+            entity_id=data['entity_id'],
+            payload=data['payload'],
+            created_at=datetime.fromisoformat(data['created_at'])
+        )
+    
+    def to_json(self):
+        return json.dumps(self.to_dict())
\ No newline at end of file
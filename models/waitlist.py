@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+class WaitlistStatus(Enum):
+    WAITING = "waiting"
+    FULFILLED = "fulfilled"
+    CANCELLED = "cancelled"
+
+@dataclass
+class WaitlistEntry:
+    id: int
+    user_id: int
+    room_type: str
+    check_in: datetime
+    check_out: datetime
+    created_at: datetime
+    status: WaitlistStatus = WaitlistStatus.WAITING
+    booking_id: Optional[int] = None
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'room_type': self.room_type,
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+            'created_at': self.created_at.isoformat(),
+            'status': self.status.value,
+            'booking_id': self.booking_id
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            id=data['id'],
+            user_id=data['user_id'],
+            room_type=data['room_type'],
+            check_in=datetime.fromisoformat(data['check_in']),
+            check_out=datetime.fromisoformat(data['check_out']),
+            created_at=datetime.fromisoformat(data['created_at']),
+            status=WaitlistStatus(data['status']),
+            booking_id=data.get('booking_id')
+        )
\ No newline at end of file
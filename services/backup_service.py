@@ -0,0 +1,181 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from utils.database import Database
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Files SQLite may create next to a database in WAL mode
+SIDECAR_SUFFIXES = ('-wal', '-shm', '-journal')
+
+class _TooManyRestarts(Exception):
+    """Raised from the progress callback to abandon a stepped backup"""
+
+class BackupService:
+    def __init__(self):
+        self.db = Database()
+    
+    def backup(self, output_path, compress=False, pages=256, step_sleep=0.01, progress=None, verify=True,
+               max_restarts=3):
+        """Copy the live database to `output_path` without pausing writers.
+        
+        The sqlite3 online backup API copies `pages` pages per step and only
+        holds a read lock on the source while a step runs; sleeping for
+        `step_sleep` seconds between steps leaves gaps for writers. If the
+        source changes mid-copy SQLite restarts the copy, so the result is
+        always a consistent snapshot.
+        
+        In WAL mode a read transaction is held on the source for the whole
+        copy: it pins one snapshot, so the copy never restarts and writers
+        keep appending to the WAL undisturbed. In rollback-journal mode that
+        would block writers, so the copy runs unpinned and, because steady
+        writes could restart it forever, is finished in one step after
+        `max_restarts` restarts. `progress` is called with
+        (copied_pages, total_pages) after every step.
+        """
+        out_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(out_dir, exist_ok=True)
+        fd, snapshot_path = tempfile.mkstemp(suffix='.db', dir=out_dir)
+        os.close(fd)
+        
+        state = {'remaining': None, 'restarts': 0}
+        
+        def on_step(status, remaining, total):
+            if progress:
+                progress(total - remaining, total)
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+                if state['restarts'] > max_restarts:
+                    raise _TooManyRestarts()
+            state['remaining'] = remaining
+            if remaining and step_sleep:
+                time.sleep(step_sleep)
+        
+        try:
+            source = self.db.get_read_connection()
+            target = sqlite3.connect(snapshot_path)
+            try:
+                pinned = source.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+                if pinned:
+                    source.execute("BEGIN")
+                    source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                try:
+                    source.backup(target, pages=pages, progress=on_step)
+                except _TooManyRestarts:
+                    source.backup(target, pages=-1)
+                if pinned:
+                    source.rollback()
+                # The copy inherits WAL mode from the source; a backup should be a single self-contained file
+                target.execute("PRAGMA journal_mode = DELETE")
+            finally:
+                target.close()
+                source.close()
+            
+            if verify:
+                self.verify(snapshot_path)
+            
+            if compress:
+                with open(snapshot_path, 'rb') as src, gzip.open(output_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+            else:
+                os.replace(snapshot_path, output_path)
+                # mkstemp creates the file private to the owner; give it the usual umask-based mode
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(output_path, 0o666 & ~umask)
+        finally:
+            self._remove_database_files(snapshot_path)
+        
+        return os.path.getsize(output_path)
+    
+    def restore(self, input_path, progress=None, verify=True):
+        """Replace the live database contents with a backup file.
+        
+        Compressed backups are detected automatically. The snapshot is
+        verified before anything is written, then copied in a single step so
+        readers never see a half-restored database.
+        
+        The backup's event journal usually ends before the live one did, so
+        the events sequence is moved past the last live sequence number and
+        a 'db.restored' event is written. Journal consumers therefore never
+        see a sequence number reused and know to resync.
+        """
+        if not os.path.exists(input_path):
+            raise ValueError("Backup file not found")
+        
+        fd, snapshot_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            with open(input_path, 'rb') as f:
+                compressed = f.read(2) == GZIP_MAGIC
+            opener = gzip.open if compressed else open
+            with opener(input_path, 'rb') as src, open(snapshot_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            
+            if verify:
+                self.verify(snapshot_path)
+            
+            def on_step(status, remaining, total):
+                if progress:
+                    progress(total - remaining, total)
+            
+            live_seq = self._last_event_seq()
+            source = sqlite3.connect(snapshot_path)
+            target = self.db.get_connection()
+            try:
+                source.backup(target, progress=on_step)
+            finally:
+                target.close()
+                source.close()
+            
+            # Older backups may predate some tables
+            self.db.init_database()
+            self._resume_event_sequence(live_seq, input_path)
+        finally:
+            self._remove_database_files(snapshot_path)
+    
+    def _remove_database_files(self, path):
+        for file_path in (path,) + tuple(path + suffix for suffix in SIDECAR_SUFFIXES):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    
+    def _last_event_seq(self):
+        conn = self.db.get_read_connection()
+        row = conn.execute("SELECT MAX(seq) FROM events").fetchone()
+        conn.close()
+        return row[0] or 0
+    
+    def _resume_event_sequence(self, live_seq, input_path):
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            restored_seq = cursor.execute("SELECT MAX(seq) FROM events").fetchone()[0] or 0
+            row = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+            next_seq = max(live_seq, restored_seq, row[0] if row else 0)
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'events'")
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('events', ?)", (next_seq,))
+            self.db.record_event(cursor, 'db.restored', 0, {
+                'backup': os.path.abspath(input_path),
+                'last_seq_in_backup': restored_seq,
+                'last_seq_before_restore': live_seq
+            })
+    
+    def verify(self, path):
+        """Run an integrity check on a database file"""
+        try:
+            conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+            try:
+                result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+                tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"Backup is not a valid database: {e}")
+        
+        if result != 'ok':
+            raise ValueError(f"Integrity check failed: {result}")
+        missing = {'users', 'rooms', 'bookings'} - tables
+        if missing:
+            raise ValueError(f"Backup is missing tables: {', '.join(sorted(missing))}")
\ No newline at end of file
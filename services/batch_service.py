@@ -0,0 +1,169 @@
+import json
+import sqlite3
+from services.booking_service import BookingService
+from utils.helpers import parse_date
+
+class BatchService:
+    """Run JSONL operations against the services in a single process"""
+    
+    def __init__(self, booking_service=None):
+        self.booking_service = booking_service or BookingService()
+        self.user_service = self.booking_service.user_service
+        self.room_service = self.booking_service.room_service
+        self.waitlist_service = self.booking_service.waitlist_service
+        self.db = self.booking_service.db
+        self.handlers = {
+            'user.create': self._user_create,
+            'user.get': self._user_get,
+            'user.list': self._user_list,
+            'room.create': self._room_create,
+            'room.get': self._room_get,
+            'room.list': self._room_list,
+            'room.set_availability': self._room_set_availability,
+            'booking.create': self._booking_create,
+            'booking.cancel': self._booking_cancel,
+            'booking.get': self._booking_get,
+            'booking.list': self._booking_list,
+            'waitlist.join': self._waitlist_join,
+        }
+    
+    def run(self, lines, transaction_size=0):
+        """Execute operations and yield one result dict per input line.
+        
+        Each line is a JSON object with an `op` name, its arguments and an
+        optional `id` echoed back in the result. With `transaction_size` set,
+        that many operations share one transaction; each runs under its own
+        savepoint so a failed operation does not undo the others, and results
+        are only yielded once their transaction has committed.
+        """
+        operations = self._parse(lines)
+        if transaction_size <= 0:
+            for line_no, op in operations:
+                yield self._execute(line_no, op)
+            return
+        
+        group = []
+        for item in operations:
+            group.append(item)
+            if len(group) == transaction_size:
+                yield from self._execute_group(group)
+                group = []
+        if group:
+            yield from self._execute_group(group)
+    
+    def _parse(self, lines):
+        for line_no, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                op = json.loads(line)
+                if not isinstance(op, dict):
+                    raise ValueError("operation must be a JSON object")
+            except ValueError as e:
+                op = {'op': None, 'error': f"Invalid JSON: {e}"}
+            yield line_no, op
+    
+    def _execute_group(self, group):
+        results = []
+        try:
+            with self.db.transaction() as conn:
+                for line_no, op in group:
+                    conn.execute("SAVEPOINT batch_op")
+                    result = self._execute(line_no, op)
+                    if result['ok']:
+                        conn.execute("RELEASE batch_op")
+                    else:
+                        conn.execute("ROLLBACK TO batch_op")
+                        conn.execute("RELEASE batch_op")
+                    results.append(result)
+        except sqlite3.Error as e:
+            results = [self._result(line_no, op, error=f"Transaction failed: {e}") for line_no, op in group]
+        return results
+    
+    def _execute(self, line_no, op):
+        if 'error' in op and op.get('op') is None:
+            return self._result(line_no, op, error=op['error'])
+        handler = self.handlers.get(op.get('op'))
+        if not handler:
+            return self._result(line_no, op, error=f"Unknown operation: {op.get('op')}")
+        try:
+            return self._result(line_no, op, result=handler(op))
+        except KeyError as e:
+            return self._result(line_no, op, error=f"Missing field: {e.args[0]}")
+        except (ValueError, TypeError, sqlite3.Error) as e:
+            return self._result(line_no, op, error=str(e))
+    
+    def _result(self, line_no, op, result=None, error=None):
+        data = {'id': op.get('id', line_no), 'op': op.get('op'), 'ok': error is None}
+        if error is None:
+            data['result'] = result
+        else:
+            data['error'] = error
+        return data
+    
+    def _user_to_dict(self, user):
+        data = user.to_dict()
+        del data['password_hash']
+        return data
+    
+    def _user_create(self, op):
+        user = self.user_service.create_user(op['name'], op['email'], op['phone'], op['password'])
+        return self._user_to_dict(user)
+    
+    def _user_get(self, op):
+        if 'email' in op:
+            user = self.user_service.get_user_by_email(op['email'])
+        else:
+            user = self.user_service.get_user_by_id(op['user_id'])
+        return self._user_to_dict(user) if user else None
+    
+    def _user_list(self, op):
+        return [self._user_to_dict(u) for u in self.user_service.list_users()]
+    
+    def _room_create(self, op):
+        room = self.room_service.create_room(op['number'], op['room_type'], int(op['capacity']),
+                                             float(op['price_per_night']))
+        return room.to_dict()
+    
+    def _room_get(self, op):
+        room = self.room_service.get_room_by_id(op['room_id'])
+        return room.to_dict() if room else None
+    
+    def _room_list(self, op):
+        if op.get('available_only'):
+            rooms = self.room_service.list_available_rooms()
+        else:
+            rooms = self.room_service.list_all_rooms()
+        return [r.to_dict() for r in rooms]
+    
+    def _room_set_availability(self, op):
+        if not self.booking_service.set_room_availability(op['room_id'], bool(op['is_available'])):
+            raise ValueError(f"Room {op['room_id']} not found")
+        return {'id': op['room_id'], 'is_available': bool(op['is_available'])}
+    
+    def _booking_create(self, op):
+        booking = self.booking_service.create_booking(op['user_id'], op['room_id'],
+                                                      parse_date(op['check_in']), parse_date(op['check_out']))
+        return booking.to_dict()
+    
+    def _booking_cancel(self, op):
+        if not self.booking_service.cancel_booking(op['booking_id']):
+            raise ValueError(f"Booking {op['booking_id']} not found")
+        return {'id': op['booking_id'], 'status': 'cancelled'}
+    
+    def _booking_get(self, op):
+        booking = self.booking_service.get_booking_by_id(op['booking_id'])
+        return booking.to_dict() if booking else None
+    
+    def _booking_list(self, op):
+        if op.get('user_id'):
+            bookings = self.booking_service.get_user_bookings(op['user_id'])
+        else:
+            bookings = self.booking_service.list_all_bookings()
+        return [b.to_dict() for b in bookings]
+    
+    def _waitlist_join(self, op):
+        entry = self.waitlist_service.join_waitlist(op['user_id'], op['room_type'],
+                                                    parse_date(op['check_in']), parse_date(op['check_out']))
+        return entry.to_dict()
\ No newline at end of file
@@ -1,14 +1,22 @@
+from bisect import bisect_left
 from datetime import datetime
 from models.booking import Booking, BookingStatus
+from models.calendar import OccupancyCalendar
+from models.room import Room, RoomType
 from services.room_service import RoomService
 from services.user_service import UserService
+from services.waitlist_service import WaitlistService
 from utils.database import Database
 
+# Nodes the group allocation search may visit before settling for its best answer so far
+ALLOCATION_NODE_BUDGET = 200000
+
 class BookingService:
     def __init__(self):
         self.db = Database()
         self.room_service = RoomService()
         self.user_service = UserService()
+        self.waitlist_service = WaitlistService()
     
     def create_booking(self, user_id, room_id, check_in, check_out):
         """Create a new booking"""
@@ -46,10 +54,12 @@ class BookingService:
             (user_id, room_id, check_in.isoformat(), check_out.isoformat(), total_price)
         )
         booking_id = cursor.lastrowid
+        booking = Booking(booking_id, user_id, room_id, check_in, check_out, total_price)
+        self.db.record_event(cursor, 'booking.created', booking_id, booking.to_dict())
         conn.commit()
         conn.close()
         
-        return Booking(booking_id, user_id, room_id, check_in, check_out, total_price)
+        return booking
     
     def _has_conflicting_booking(self, room_id, check_in, check_out):
         """Check if there are conflicting bookings"""
@@ -71,19 +81,263 @@ class BookingService:
                 return True
         return False
     
+    def find_free_rooms(self, check_in, check_out, room_type=None):
+        """List available rooms with no confirmed booking overlapping the dates"""
+        query = '''
+            SELECT * FROM rooms r
+            WHERE r.is_available = 1
+            AND NOT EXISTS (
+                SELECT 1 FROM bookings b
+                WHERE b.room_id = r.id AND b.status = 'confirmed'
+                AND b.check_in < ? AND b.check_out > ?
+            )
+        '''
+        params = [check_out.isoformat(), check_in.isoformat()]
+        if room_type:
+            query += " AND r.room_type = ?"
+            params.append(room_type)
+        
+        conn = self.db.get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [Room(row[0], row[1], RoomType(row[2]), row[3], row[4], bool(row[5])) for row in rows]
+    
+    def occupancy_calendar(self, start, end, room_type=None):
+        """Build a rooms x nights occupancy grid for [start, end).
+        
+        All confirmed bookings overlapping the range are read in one query
+        and each marks its nights in its room's row with a single slice
+        assignment, so no per-room or per-day lookups are made.
+        """
+        if start >= end:
+            raise ValueError("End date must be after start date")
+        
+        with self.db.snapshot() as conn:
+            cursor = conn.cursor()
+            if room_type:
+                cursor.execute("SELECT * FROM rooms WHERE room_type = ? ORDER BY id", (room_type,))
+            else:
+                cursor.execute("SELECT * FROM rooms ORDER BY id")
+            rooms = [Room(row[0], row[1], RoomType(row[2]), row[3], row[4], bool(row[5])) for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT room_id, check_in, check_out FROM bookings WHERE status = 'confirmed' AND check_in < ? AND check_out > ?",
+                (end.isoformat(), start.isoformat())
+            )
+            bookings = cursor.fetchall()
+        
+        days = (end - start).days
+        row_of = {room.id: i for i, room in enumerate(rooms)}
+        nights = [bytearray(days) for _ in rooms]
+        for room_id, check_in, check_out in bookings:
+            i = row_of.get(room_id)
+            if i is None:
+                continue
+            first = max(0, (datetime.fromisoformat(check_in) - start).days)
+            last = min(days, (datetime.fromisoformat(check_out) - start).days)
+            if first < last:
+                nights[i][first:last] = b'\x01' * (last - first)
+        
+        return OccupancyCalendar(start, end, rooms, nights)
+    
+    def plan_group_allocation(self, guests, check_in, check_out, max_rooms=None, strategy='cheapest'):
+        """Choose free rooms that together sleep `guests` people.
+        
+        `strategy` is 'cheapest' (lowest total price) or 'fewest' (fewest
+        rooms, cheapest among those). Returns the chosen rooms, or raises
+        ValueError if no set of at most `max_rooms` free rooms fits the group.
+        """
+        if guests < 1:
+            raise ValueError("Number of guests must be at least 1")
+        if check_in >= check_out:
+            raise ValueError("Check-out date must be after check-in date")
+        if strategy not in ('cheapest', 'fewest'):
+            raise ValueError("Strategy must be 'cheapest' or 'fewest'")
+        
+        max_rooms = min(max_rooms or guests, guests)
+        rooms = self.find_free_rooms(check_in, check_out)
+        chosen = self._optimize_allocation(rooms, guests, max_rooms, strategy)
+        if chosen is None:
+            raise ValueError("Not enough free rooms for this group")
+        return chosen
+    
+    def allocate_group(self, user_id, guests, check_in, check_out, max_rooms=None, strategy='cheapest'):
+        """Book an optimal set of rooms for a group in a single transaction"""
+        with self.db.transaction():
+            rooms = self.plan_group_allocation(guests, check_in, check_out, max_rooms, strategy)
+            return [self.create_booking(user_id, room.id, check_in, check_out) for room in rooms]
+    
+    def _optimize_allocation(self, rooms, guests, max_rooms, strategy, node_budget=ALLOCATION_NODE_BUDGET):
+        """Branch and bound over groups of interchangeable rooms.
+        
+        Rooms with the same capacity and price form one kind. Kinds are
+        tried cheapest-per-bed first, most rooms first, so the first
+        solution found is the greedy one. A branch is pruned when a
+        fractional fill of the remaining guests cannot beat the best price
+        found, or when the rooms left cannot possibly sleep the remaining
+        guests. Both bounds come from arrays built once, so each node costs
+        O(log k). The search uses an explicit stack and stops after
+        `node_budget` nodes. It then returns the best allocation found so
+        far, which is never worse than the greedy one.
+        """
+        groups = {}
+        for room in rooms:
+            if room.capacity > 0:
+                groups.setdefault((room.capacity, room.price_per_night), []).append(room)
+        kinds = sorted(groups.items(), key=lambda item: (item[0][1] / item[0][0], -item[0][0]))
+        
+        if strategy == 'fewest':
+            fewest = self._fewest_rooms(kinds, guests)
+            if fewest is None:
+                return None
+            max_rooms = min(max_rooms, fewest)
+        
+        # Prefix sums of beds and price over kinds in per-bed price order,
+        # and the largest capacity from each kind onwards
+        bed_totals = [0]
+        price_totals = [0.0]
+        for (capacity, price), members in kinds:
+            bed_totals.append(bed_totals[-1] + capacity * len(members))
+            price_totals.append(price_totals[-1] + price * len(members))
+        largest_after = [0] * (len(kinds) + 1)
+        for k in range(len(kinds) - 1, -1, -1):
+            largest_after[k] = max(kinds[k][0][0], largest_after[k + 1])
+        
+        def lower_bound(k, need):
+            target = bed_totals[k] + need
+            last = bisect_left(bed_totals, target)
+            if last >= len(bed_totals):
+                return float('inf')
+            (capacity, price), members = kinds[last - 1]
+            return price_totals[last - 1] - price_totals[k] + (target - bed_totals[last - 1]) * price / capacity
+        
+        best_cost = float('inf')
+        best_chain = None
+        nodes = 0
+        # Each entry is (kind index, guests still unhoused, rooms left, cost, chosen)
+        # where chosen is a linked list of (kind index, count, rest)
+        stack = [(0, guests, max_rooms, 0.0, None)]
+        while stack and nodes < node_budget:
+            k, need, rooms_left, cost, chosen = stack.pop()
+            nodes += 1
+            if need <= 0:
+                if cost < best_cost - 1e-9:
+                    best_cost, best_chain = cost, chosen
+                continue
+            if k == len(kinds) or cost + lower_bound(k, need) >= best_cost - 1e-9:
+                continue
+            if min(bed_totals[-1] - bed_totals[k], rooms_left * largest_after[k]) < need:
+                continue
+            (capacity, price), members = kinds[k]
+            top = min(len(members), rooms_left, -(-need // capacity))
+            # Pushed in ascending order so the most rooms of this kind is explored first
+            for count in range(top + 1):
+                stack.append((k + 1, need - count * capacity, rooms_left - count, cost + count * price,
+                              (k, count, chosen) if count else chosen))
+        
+        if best_chain is None:
+            if stack:
+                return self._largest_first(kinds, guests, max_rooms)
+            return None
+        
+        chosen = []
+        while best_chain:
+            k, count, best_chain = best_chain
+            chosen.extend(sorted(kinds[k][1], key=lambda room: room.number)[:count])
+        return chosen
+    
+    def _largest_first(self, kinds, guests, max_rooms):
+        """Greedy fallback: the largest rooms, cheapest first, until the group fits"""
+        by_size = sorted(kinds, key=lambda item: (-item[0][0], item[0][1]))
+        chosen = []
+        for (capacity, price), members in by_size:
+            for room in sorted(members, key=lambda room: room.number):
+                if guests <= 0 or len(chosen) == max_rooms:
+                    break
+                chosen.append(room)
+                guests -= capacity
+        return chosen if guests <= 0 else None
+    
+    def _fewest_rooms(self, kinds, guests):
+        """Smallest number of rooms that can sleep `guests`, taking the largest rooms first"""
+        rooms = 0
+        for (capacity, price), members in sorted(kinds, key=lambda item: -item[0][0]):
+            used = min(len(members), -(-guests // capacity))
+            rooms += used
+            guests -= used * capacity
+            if guests <= 0:
+                return rooms
+        return None
+    
     def cancel_booking(self, booking_id):
-        """Cancel a booking"""
+        """Cancel a booking and offer the freed dates to the waitlist"""
+        booking = self.get_booking_by_id(booking_id)
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("UPDATE bookings SET status = 'cancelled' WHERE id = ?", (booking_id,))
+        cursor.execute(
+            "UPDATE bookings SET status = 'cancelled' WHERE id = ? AND status != 'cancelled'",
+            (booking_id,)
+        )
         affected = cursor.rowcount
+        if affected:
+            self.db.record_event(cursor, 'booking.cancelled', booking_id, {
+                'id': booking_id,
+                'room_id': booking.room_id,
+                'status': BookingStatus.CANCELLED.value,
+                'previous_status': booking.status.value
+            })
         conn.commit()
         conn.close()
-        return affected > 0
+        
+        if affected and booking.status == BookingStatus.CONFIRMED:
+            self.fill_from_waitlist(booking.room_id, booking.check_in, booking.check_out)
+        # Cancelling an already cancelled booking still succeeds, but changes nothing
+        return booking is not None
+    
+    def set_room_availability(self, room_id, is_available):
+        """Open or close a room, offering a reopened room to the waitlist"""
+        updated = self.room_service.update_room_availability(room_id, is_available)
+        if updated and is_available:
+            self.fill_from_waitlist(room_id)
+        return updated
+    
+    def fill_from_waitlist(self, room_id, check_in=None, check_out=None):
+        """Convert waiting entries into bookings for a freed room.
+        
+        When a date range is given only entries overlapping it are
+        considered; otherwise every future entry for the room type is.
+        Entries that also need nights the room is booked for are rejected
+        by create_booking's conflict check and stay waiting.
+        Claiming an entry, booking it and recording the booking happen in
+        one transaction, so a failure part way leaves the entry waiting.
+        Returns the list of bookings created.
+        """
+        room = self.room_service.get_room_by_id(room_id)
+        if not room or not room.is_available:
+            return []
+        
+        candidates = self.waitlist_service.find_candidates(room.room_type.value, check_in, check_out)
+        bookings = []
+        for entry in candidates:
+            if any(not (entry.check_out <= b.check_in or entry.check_in >= b.check_out) for b in bookings):
+                continue
+            try:
+                with self.db.transaction():
+                    if not self.waitlist_service.claim_entry(entry.id):
+                        continue
+                    booking = self.create_booking(entry.user_id, room_id, entry.check_in, entry.check_out)
+                    self.waitlist_service.mark_fulfilled(entry.id, booking.id)
+            except ValueError:
+                continue
+            bookings.append(booking)
+        return bookings
     
     def get_booking_by_id(self, booking_id):
         """Get booking by ID"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM bookings WHERE id = ?", (booking_id,))
         row = cursor.fetchone()
@@ -100,7 +354,7 @@ class BookingService:
     
     def get_user_bookings(self, user_id):
         """Get all bookings for a user"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM bookings WHERE user_id = ?", (user_id,))
         rows = cursor.fetchall()
@@ -115,7 +369,7 @@ class BookingService:
     
     def list_all_bookings(self):
         """List all bookings"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM bookings")
         rows = cursor.fetchall()
@@ -0,0 +1,58 @@
+import json
+import time
+from datetime import datetime
+from models.event import Event
+from utils.database import Database
+
+class EventService:
+    def __init__(self):
+        self.db = Database()
+    
+    def get_events(self, since=0, limit=None, event_type=None):
+        """Get journal events with a sequence number greater than `since`"""
+        query = "SELECT * FROM events WHERE seq > ?"
+        params = [since]
+        if event_type:
+            query += " AND event_type = ?"
+            params.append(event_type)
+        query += " ORDER BY seq"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        conn = self.db.get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_event(row) for row in rows]
+    
+    def latest_seq(self):
+        """Get the sequence number of the most recent event"""
+        conn = self.db.get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(seq) FROM events")
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] or 0
+    
+    def tail(self, since=0, follow=False, poll_interval=1.0, batch_size=500, event_type=None):
+        """Yield events after `since` in sequence order.
+        
+        With `follow` the journal is polled for new events until the caller
+        stops iterating; otherwise iteration ends once the journal is caught up.
+        """
+        while True:
+            events = self.get_events(since, batch_size, event_type)
+            for event in events:
+                since = event.seq
+                yield event
+            if len(events) == batch_size:
+                continue
+            if not follow:
+                return
+            time.sleep(poll_interval)
+    
+    def _row_to_event(self, row):
+        return Event(row[0], row[1], row[2], json.loads(row[3]), datetime.fromisoformat(row[4]))
\ No newline at end of file
@@ -21,14 +21,16 @@ class RoomService:
             (number, room_type, capacity, price_per_night)
         )
         room_id = cursor.lastrowid
+        room = Room(room_id, number, RoomType(room_type), capacity, price_per_night)
+        self.db.record_event(cursor, 'room.created', room_id, room.to_dict())
         conn.commit()
         conn.close()
         
-        return Room(room_id, number, RoomType(room_type), capacity, price_per_night)
+        return room
     
     def get_room_by_id(self, room_id):
         """Get room by ID"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM rooms WHERE id = ?", (room_id,))
         row = cursor.fetchone()
@@ -40,7 +42,7 @@ class RoomService:
     
     def list_available_rooms(self):
         """List all available rooms"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM rooms WHERE is_available = 1")
         rows = cursor.fetchall()
@@ -50,7 +52,7 @@ class RoomService:
     
     def list_all_rooms(self):
         """List all rooms"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM rooms")
         rows = cursor.fetchall()
@@ -59,11 +61,18 @@ class RoomService:
         return [Room(row[0], row[1], RoomType(row[2]), row[3], row[4], bool(row[5])) for row in rows]
     
     def update_room_availability(self, room_id, is_available):
-        """Update room availability"""
+        """Update room availability.
+        
+        This does not match the waitlist against a reopened room; use
+        BookingService.set_room_availability for that.
+        """
         conn = self.db.get_connection()
         cursor = conn.cursor()
         cursor.execute("UPDATE rooms SET is_available = ? WHERE id = ?", (is_available, room_id))
         affected = cursor.rowcount
+        if affected:
+            self.db.record_event(cursor, 'room.availability_changed', room_id,
+                                 {'id': room_id, 'is_available': bool(is_available)})
         conn.commit()
         conn.close()
         return affected > 0
\ No newline at end of file
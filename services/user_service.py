@@ -29,6 +29,8 @@ class UserService:
             (name, email, phone, password_hash)
         )
         user_id = cursor.lastrowid
+        self.db.record_event(cursor, 'user.created', user_id,
+                             {'id': user_id, 'name': name, 'email': email, 'phone': phone})
         conn.commit()
         conn.close()
         
@@ -43,7 +45,7 @@ class UserService:
     
     def get_user_by_id(self, user_id):
         """Get user by ID"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
         row = cursor.fetchone()
@@ -55,7 +57,7 @@ class UserService:
     
     def get_user_by_email(self, email):
         """Get user by email"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
         row = cursor.fetchone()
@@ -67,7 +69,7 @@ class UserService:
     
     def list_users(self):
         """List all users"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users")
         rows = cursor.fetchall()
@@ -0,0 +1,145 @@
+from datetime import datetime
+from models.room import RoomType
+from models.waitlist import WaitlistEntry, WaitlistStatus
+from utils.database import Database
+
+class WaitlistService:
+    def __init__(self):
+        self.db = Database()
+    
+    def join_waitlist(self, user_id, room_type, check_in, check_out):
+        """Add a waitlist entry for a room type and date range"""
+        try:
+            RoomType(room_type)
+        except ValueError:
+            raise ValueError("Invalid room type")
+        
+        if check_in >= check_out:
+            raise ValueError("Check-out date must be after check-in date")
+        
+        if check_in < datetime.now():
+            raise ValueError("Check-in date cannot be in the past")
+        
+        created_at = datetime.now()
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO waitlist (user_id, room_type, check_in, check_out, created_at) VALUES (?, ?, ?, ?, ?)",
+            (user_id, room_type, check_in.isoformat(), check_out.isoformat(), created_at.isoformat())
+        )
+        entry_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        
+        return WaitlistEntry(entry_id, user_id, room_type, check_in, check_out, created_at)
+    
+    def cancel_entry(self, entry_id):
+        """Remove a waiting entry from the waitlist"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE waitlist SET status = 'cancelled' WHERE id = ? AND status = 'waiting'",
+            (entry_id,)
+        )
+        affected = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return affected > 0
+    
+    def get_entry_by_id(self, entry_id):
+        """Get waitlist entry by ID"""
+        conn = self.db.get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM waitlist WHERE id = ?", (entry_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row:
+            return self._row_to_entry(row)
+        return None
+    
+    def get_user_entries(self, user_id):
+        """Get all waitlist entries for a user"""
+        conn = self.db.get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM waitlist WHERE user_id = ? ORDER BY id", (user_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_entry(row) for row in rows]
+    
+    def list_entries(self, status=None):
+        """List waitlist entries, optionally filtered by status"""
+        conn = self.db.get_read_connection()
+        cursor = conn.cursor()
+        if status:
+            cursor.execute("SELECT * FROM waitlist WHERE status = ? ORDER BY id", (status,))
+        else:
+            cursor.execute("SELECT * FROM waitlist ORDER BY id")
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_entry(row) for row in rows]
+    
+    def find_candidates(self, room_type, check_in=None, check_out=None, limit=None):
+        """Find waiting entries for a room type that overlap a freed date range.
+        
+        Uses the (room_type, status, check_in) index as a range scan, so only
+        entries starting before the end of the freed range are read. Entries
+        may also need nights outside the range; the caller checks that the
+        room is free for those. Results are in first-come, first-served order.
+        """
+        query = "SELECT * FROM waitlist WHERE room_type = ? AND status = 'waiting' AND check_in >= ?"
+        params = [room_type, datetime.now().isoformat()]
+        if check_out:
+            query += " AND check_in < ?"
+            params.append(check_out.isoformat())
+        if check_in:
+            query += " AND check_out > ?"
+            params.append(check_in.isoformat())
+        query += " ORDER BY created_at, id"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        conn = self.db.get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_entry(row) for row in rows]
+    
+    def claim_entry(self, entry_id):
+        """Claim a waiting entry so no other process converts it.
+        
+        Call inside Database.transaction() together with the booking and
+        mark_fulfilled(), so the claim is undone if the booking fails.
+        """
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE waitlist SET status = 'fulfilled' WHERE id = ? AND status = 'waiting'",
+            (entry_id,)
+        )
+        affected = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return affected > 0
+    
+    def mark_fulfilled(self, entry_id, booking_id):
+        """Record the booking that fulfilled a claimed entry"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE waitlist SET booking_id = ? WHERE id = ?", (booking_id, entry_id))
+        conn.commit()
+        conn.close()
+    
+    def _row_to_entry(self, row):
+        return WaitlistEntry(
+            row[0], row[1], row[2],
+            datetime.fromisoformat(row[3]),
+            datetime.fromisoformat(row[4]),
+            datetime.fromisoformat(row[5]),
+            WaitlistStatus(row[6]), row[7]
+        )
\ No newline at end of file
@@ -1,21 +1,154 @@
 import sqlite3
+import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
+
+JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off')
+
+# Connections of transactions opened with Database.transaction() and
+# Database.snapshot(), per thread and path
+_local = threading.local()
+
+class _SharedConnection:
+    """Connection handed out inside a transaction or snapshot; commit and close are left to the owner"""
+    
+    def __init__(self, conn):
+        self._conn = conn
+    
+    def commit(self):
+        pass
+    
+    def close(self):
+        pass
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
 
 class Database:
-    def __init__(self, db_path='data/hostel.db'):
-        self.db_path = db_path
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # Settings used by every Database created afterwards, see configure()
+    default_path = 'data/hostel.db'
+    timeout = 5.0
+    journal_mode = 'wal'
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path or Database.default_path
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
         self.init_database()
     
+    @classmethod
+    def configure(cls, db_path=None, timeout=None, journal_mode=None):
+        """Change the database path, busy timeout or journal mode for new Database objects"""
+        if db_path is not None:
+            cls.default_path = db_path
+        if timeout is not None:
+            cls.timeout = timeout
+        if journal_mode is not None:
+            if journal_mode not in JOURNAL_MODES:
+                raise ValueError(f"Unknown journal mode: {journal_mode}")
+            cls.journal_mode = journal_mode
+    
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        transactions = getattr(_local, 'transactions', {})
+        if self.db_path in transactions:
+            return _SharedConnection(transactions[self.db_path])
+        return sqlite3.connect(self.db_path, timeout=self.timeout)
+    
+    def get_read_connection(self):
+        """Open a read-only connection for queries that never write.
+        
+        Inside a transaction() the writer's connection is returned so reads
+        see its uncommitted changes; inside a snapshot() every read shares
+        the snapshot's connection. In WAL mode these connections never block
+        or wait for writers.
+        """
+        transactions = getattr(_local, 'transactions', {})
+        if self.db_path in transactions:
+            return _SharedConnection(transactions[self.db_path])
+        snapshots = getattr(_local, 'snapshots', {})
+        if self.db_path in snapshots:
+            return _SharedConnection(snapshots[self.db_path])
+        return self._open_read_connection()
+    
+    def _open_read_connection(self):
+        uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, timeout=self.timeout)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    @contextmanager
+    def snapshot(self):
+        """Serve every read made inside the block from one consistent snapshot.
+        
+        Meant for listings and exports that issue many queries. In WAL mode
+        writers carry on undisturbed while the snapshot is open; in
+        rollback-journal mode they wait until the block ends.
+        """
+        if not hasattr(_local, 'snapshots'):
+            _local.snapshots = {}
+        if self.db_path in _local.snapshots or self.db_path in getattr(_local, 'transactions', {}):
+            yield self.get_read_connection()
+            return
+        
+        conn = self._open_read_connection()
+        conn.isolation_level = None
+        conn.execute("BEGIN")
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        _local.snapshots[self.db_path] = conn
+        try:
+            yield conn
+        finally:
+            del _local.snapshots[self.db_path]
+            conn.execute("ROLLBACK")
+            conn.close()
+    
+    @contextmanager
+    def transaction(self):
+        """Run every service call made inside the block in one transaction.
+        
+        Any Database for the same path on this thread hands out the shared
+        connection, so the work of several services commits or rolls back
+        together. A nested block runs under a savepoint, so an error inside
+        it only undoes the nested work.
+        """
+        if not hasattr(_local, 'transactions'):
+            _local.transactions = {}
+        if self.db_path in _local.transactions:
+            conn = _local.transactions[self.db_path]
+            conn.execute("SAVEPOINT nested_transaction")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK TO nested_transaction")
+                raise
+            finally:
+                conn.execute("RELEASE nested_transaction")
+            return
+        
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        _local.transactions[self.db_path] = conn
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            del _local.transactions[self.db_path]
+            conn.close()
     
     def init_database(self):
         """Initialize database tables"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        if self.journal_mode:
+            cursor.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        
         # Users table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -54,5 +187,48 @@ class Database:
             )
         ''')
         
+        # Waitlist table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS waitlist (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                room_type TEXT NOT NULL,
+                check_in TEXT NOT NULL,
+                check_out TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                status TEXT DEFAULT 'waiting',
+                booking_id INTEGER,
+                FOREIGN KEY (user_id) REFERENCES users (id),
+                FOREIGN KEY (booking_id) REFERENCES bookings (id)
+            )
+        ''')
+        
+        # Append-only event journal, written in the same transaction as each change
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        
+        # Indexes used to match freed rooms against the waitlist
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_waitlist_match ON waitlist (room_type, status, check_in)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_bookings_room ON bookings (room_id, status)"
+        )
+        
         conn.commit()
-        conn.close()
\ No newline at end of file
+        conn.close()
+    
+    def record_event(self, cursor, event_type, entity_id, payload):
+        """Append an event to the journal using the caller's transaction"""
+        cursor.execute(
+            "INSERT INTO events (event_type, entity_id, payload, created_at) VALUES (?, ?, ?, ?)",
+            (event_type, entity_id, json.dumps(payload), datetime.now().isoformat())
+        )
+        return cursor.lastrowid
\ No newline at end of file
@@ -0,0 +1,180 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from utils.database import Database, JOURNAL_MODES
+
+# Default share of each operation in the workload
+DEFAULT_MIX = {
+    'create_booking': 40,
+    'cancel_booking': 10,
+    'get_user_bookings': 25,
+    'find_free_rooms': 25,
+}
+
+def parse_mix(text):
+    """Parse an operation mix like 'create_booking=40,cancel_booking=10'"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation: {name}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {name}: {weight}")
+    if not any(mix.values()):
+        raise ValueError("Operation mix must have at least one positive weight")
+    return mix
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+def seed_database(db_path, journal_mode, users, rooms):
+    """Create a fresh database with load-test users and rooms"""
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unknown journal mode: {journal_mode}")
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    
+    db = Database(db_path)
+    conn = db.get_connection()
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.executemany(
+        "INSERT INTO users (name, email, phone, password_hash) VALUES (?, ?, ?, ?)",
+        [(f"Load User {i}", f"load{i}@example.com", "0700000000", "x") for i in range(users)]
+    )
+    conn.executemany(
+        "INSERT INTO rooms (number, room_type, capacity, price_per_night) VALUES (?, ?, ?, ?)",
+        [(f"L{i}", 'single', 1, 1000.0) for i in range(rooms)]
+    )
+    conn.commit()
+    conn.close()
+
+def _is_lock_error(error):
+    message = str(error)
+    return 'locked' in message or 'busy' in message
+
+def _worker(worker_id, config, start_at, results):
+    """Run random operations until the deadline and report latencies"""
+    from services.booking_service import BookingService
+    
+    Database.configure(db_path=config['db_path'], timeout=config['timeout'], journal_mode=config['journal_mode'])
+    booking_service = BookingService()
+    rng = random.Random(config['seed'] + worker_id)
+    latencies = {name: [] for name in config['mix'] if config['mix'][name] > 0}
+    stats = {'locked': 0, 'rejected': 0, 'errors': 0}
+    
+    time.sleep(max(0, start_at - time.time()))
+    deadline = start_at + config['duration']
+    try:
+        _run_operations(booking_service, config, rng, deadline, latencies, stats)
+    finally:
+        results.put((latencies, stats))
+
+def _run_operations(booking_service, config, rng, deadline, latencies, stats):
+    names = [name for name in config['mix'] if config['mix'][name] > 0]
+    weights = [config['mix'][name] for name in names]
+    first_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    my_bookings = []
+    
+    while time.time() < deadline:
+        name = rng.choices(names, weights)[0]
+        if name == 'cancel_booking' and not my_bookings:
+            continue
+        check_in = first_day + timedelta(days=rng.randrange(config['days']))
+        check_out = check_in + timedelta(days=rng.randint(1, 4))
+        started = time.perf_counter()
+        try:
+            if name == 'create_booking':
+                booking = booking_service.create_booking(
+                    rng.randint(1, config['users']), rng.randint(1, config['rooms']), check_in, check_out
+                )
+                my_bookings.append(booking.id)
+            elif name == 'cancel_booking':
+                booking_service.cancel_booking(my_bookings.pop(rng.randrange(len(my_bookings))))
+            elif name == 'get_user_bookings':
+                booking_service.get_user_bookings(rng.randint(1, config['users']))
+            else:
+                booking_service.find_free_rooms(check_in, check_out)
+        except ValueError:
+            stats['rejected'] += 1
+        except sqlite3.OperationalError as e:
+            if _is_lock_error(e):
+                stats['locked'] += 1
+            else:
+                stats['errors'] += 1
+            continue
+        latencies[name].append(time.perf_counter() - started)
+
+def count_double_bookings(db_path):
+    """Count pairs of confirmed bookings for the same room with overlapping nights"""
+    conn = sqlite3.connect(db_path)
+    row = conn.execute('''
+        SELECT COUNT(*) FROM bookings a
+        JOIN bookings b ON a.room_id = b.room_id AND a.id < b.id
+        WHERE a.status = 'confirmed' AND b.status = 'confirmed'
+        AND a.check_in < b.check_out AND b.check_in < a.check_out
+    ''').fetchone()
+    conn.close()
+    return row[0]
+
+def run_load_test(db_path, workers, journal_mode, timeout=5.0, duration=10.0, mix=None,
+                  users=100, rooms=200, days=60, seed=1):
+    """Run one load-test configuration against a fresh database and summarise it"""
+    config = {
+        'db_path': os.path.abspath(db_path),
+        'journal_mode': journal_mode,
+        'timeout': timeout,
+        'duration': duration,
+        'mix': mix or DEFAULT_MIX,
+        'users': users,
+        'rooms': rooms,
+        'days': days,
+        'seed': seed,
+    }
+    seed_database(config['db_path'], journal_mode, users, rooms)
+    
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(start_method)
+    results = context.Queue()
+    start_at = time.time() + 1.0 + 0.05 * workers
+    processes = [context.Process(target=_worker, args=(i, config, start_at, results)) for i in range(workers)]
+    for process in processes:
+        process.start()
+    
+    latencies = {}
+    stats = {'locked': 0, 'rejected': 0, 'errors': 0}
+    for _ in processes:
+        worker_latencies, worker_stats = results.get()
+        for name, values in worker_latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        for key, value in worker_stats.items():
+            stats[key] += value
+    for process in processes:
+        process.join()
+    
+    all_latencies = sorted(v for values in latencies.values() for v in values)
+    writes = sorted(latencies.get('create_booking', []) + latencies.get('cancel_booking', []))
+    return {
+        'journal_mode': journal_mode,
+        'workers': workers,
+        'timeout': timeout,
+        'operations': len(all_latencies),
+        'throughput': len(all_latencies) / duration,
+        'p50_ms': percentile(all_latencies, 50) * 1000,
+        'p99_ms': percentile(all_latencies, 99) * 1000,
+        'write_p99_ms': percentile(writes, 99) * 1000,
+        'locked': stats['locked'],
+        'rejected': stats['rejected'],
+        'errors': stats['errors'],
+        'double_bookings': count_double_bookings(config['db_path']),
+    }
\ No newline at end of file